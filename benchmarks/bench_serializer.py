@@ -0,0 +1,67 @@
+"""
+Benchmarks snapshot serialization on a large synthetic `show interfaces`
+document. Rows separate the two effects: dropping indentation (stdlib
+indent=2 vs stdlib compact) and switching backend (stdlib compact vs
+orjson compact, when orjson is installed).
+
+    python benchmarks/bench_serializer.py [interface_count]
+"""
+import json
+import sys
+import timeit
+
+from netsnap import serializer
+
+def build_device(interface_count):
+    interfaces = {}
+    for i in range(interface_count):
+        interfaces[f"GigabitEthernet1/0/{i}"] = {
+            'oper_status': 'up' if i % 7 else 'down',
+            'enabled': True,
+            'line_protocol': 'up',
+            'mtu': 1500,
+            'bandwidth': 1000000,
+            'description': f"link-{i}",
+            'counters': {
+                'in_pkts': i * 1000,
+                'out_pkts': i * 900,
+                'in_octets': i * 64000,
+                'out_octets': i * 57600,
+                'in_errors': 0,
+                'out_errors': 0,
+                'in_crc_errors': 0,
+                'rate': {'load_interval': 300, 'in_rate': i * 10, 'out_rate': i * 9},
+            },
+        }
+    return {'hostname': 'bench-rtr', 'interfaces': interfaces, 'cpu': {}, 'memory': {}}
+
+def main():
+    interface_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    repeat = 20
+    doc = build_device(interface_count)
+
+    indented = json.dumps(doc, indent=2)
+    compact = json.dumps(doc, separators=(',', ':'))
+
+    results = [
+        ('json indent=2 dumps', timeit.timeit(lambda: json.dumps(doc, indent=2), number=repeat)),
+        ('json compact dumps', timeit.timeit(lambda: json.dumps(doc, separators=(',', ':')), number=repeat)),
+        ('json loads (indented)', timeit.timeit(lambda: json.loads(indented), number=repeat)),
+        ('json loads (compact)', timeit.timeit(lambda: json.loads(compact), number=repeat)),
+    ]
+    if serializer.orjson:
+        orjson = serializer.orjson
+        results += [
+            ('orjson compact dumps', timeit.timeit(lambda: orjson.dumps(doc), number=repeat)),
+            ('orjson loads (compact)', timeit.timeit(lambda: orjson.loads(compact), number=repeat)),
+        ]
+
+    print(f"{interface_count} interfaces, {repeat} iterations, backend={serializer.BACKEND}")
+    print(f"size: indented={len(indented)} bytes, compact={len(compact)} bytes")
+    if not serializer.orjson:
+        print("orjson not installed: only the indentation effect is measured")
+    for label, seconds in results:
+        print(f"{label:<28} {seconds / repeat * 1000:8.2f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+import hashlib
+import io
+import os
+import shutil
+import tarfile
+import tempfile
+from netsnap import serializer
+
+CHUNK_SIZE = 64 * 1024
+
+class _ChunkBuffer:
+    """
+    Write-only file object that hands compressed output back to the caller
+    between archive members instead of accumulating the whole archive.
+    """
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+def _sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _snapshot_files(snapshot_dir):
+    return sorted(f for f in os.listdir(snapshot_dir) if f.endswith('.json') and f != 'metadata.json')
+
+def iter_export(snapshot_dir):
+    """
+    Streams a snapshot directory as a gzip-compressed tar archive.
+
+    metadata.json is written first and carries a SHA-256 digest for every
+    device file, computed here for snapshots captured before digests were
+    recorded.
+
+    Args:
+        snapshot_dir (str): Path to the snapshot directory.
+
+    Yields:
+        bytes: Consecutive chunks of the archive.
+    """
+    metadata = serializer.load(os.path.join(snapshot_dir, 'metadata.json'))
+    files = _snapshot_files(snapshot_dir)
+    digests = metadata.get('digests') or {}
+    if any(f not in digests for f in files):
+        digests = {f: _sha256_file(os.path.join(snapshot_dir, f)) for f in files}
+    metadata['digests'] = digests
+
+    buffer = _ChunkBuffer()
+    with tarfile.open(fileobj=buffer, mode='w|gz') as tar:
+        raw = serializer.dumps(metadata)
+        info = tarfile.TarInfo('metadata.json')
+        info.size = len(raw)
+        tar.addfile(info, io.BytesIO(raw))
+        yield buffer.drain()
+
+        for filename in files:
+            tar.add(os.path.join(snapshot_dir, filename), arcname=filename, recursive=False)
+            data = buffer.drain()
+            if data:
+                yield data
+
+    yield buffer.drain()
+
+def export_snapshot(snapshot_dir, fileobj):
+    """
+    Writes a snapshot archive to a binary file object.
+    """
+    for chunk in iter_export(snapshot_dir):
+        fileobj.write(chunk)
+
+def import_snapshot(fileobj, output_dir='snapshots'):
+    """
+    Imports a snapshot archive produced by export_snapshot.
+
+    Members are streamed to a staging directory and verified against the
+    digests in metadata.json; the snapshot only appears under output_dir
+    once every file has been verified.
+
+    Args:
+        fileobj: Readable binary file object with the archive.
+        output_dir (str): Directory holding snapshots.
+
+    Returns:
+        str: Path to the imported snapshot directory.
+
+    Raises:
+        ValueError: If the archive is malformed or a digest does not match.
+        FileExistsError: If the snapshot already exists.
+    """
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    staging = tempfile.mkdtemp(prefix='.import-', dir=output_dir)
+    try:
+        metadata = None
+        seen = set()
+        with tarfile.open(fileobj=fileobj, mode='r|gz') as tar:
+            for member in tar:
+                name = member.name
+                if not member.isfile() or os.path.basename(name) != name or not name.endswith('.json'):
+                    raise ValueError(f"Unexpected archive member: {name}")
+
+                source = tar.extractfile(member)
+                if metadata is None:
+                    if name != 'metadata.json':
+                        raise ValueError("Archive does not start with metadata.json")
+                    metadata = serializer.loads(source.read())
+                    if not metadata.get('snapshot_id') or 'digests' not in metadata:
+                        raise ValueError("Archive metadata is missing snapshot_id or digests")
+                    continue
+
+                expected = metadata['digests'].get(name)
+                if expected is None:
+                    raise ValueError(f"No digest recorded for {name}")
+
+                digest = hashlib.sha256()
+                with open(os.path.join(staging, name), 'wb') as f:
+                    for chunk in iter(lambda: source.read(CHUNK_SIZE), b''):
+                        digest.update(chunk)
+                        f.write(chunk)
+                if digest.hexdigest() != expected:
+                    raise ValueError(f"Digest mismatch for {name}")
+                seen.add(name)
+
+        if metadata is None:
+            raise ValueError("Empty snapshot archive")
+        missing = set(metadata['digests']) - seen
+        if missing:
+            raise ValueError(f"Archive is missing files: {', '.join(sorted(missing))}")
+
+        snapshot_id = os.path.basename(metadata['snapshot_id'])
+        target = os.path.join(output_dir, snapshot_id)
+        if os.path.exists(target):
+            raise FileExistsError(f"Snapshot already exists: {target}")
+
+        serializer.dump(metadata, os.path.join(staging, 'metadata.json'))
+        os.rename(staging, target)
+        return target
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
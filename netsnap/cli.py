@@ -4,8 +4,8 @@ import sys
 from netsnap.inventory_parser import parse_inventory
 from netsnap.testbed_generator import generate_testbed
 from netsnap.snapshot_collector import capture_snapshot
-from netsnap.comparator import compare_snapshots
-from netsnap.reporter import generate_console_report
+from netsnap.comparator import compare_snapshots, compare_against_baselines
+from netsnap.reporter import generate_console_report, generate_consolidated_report
 
 @click.group()
 def cli():
@@ -19,8 +19,12 @@ def init(inventory, output):
     """Initialize testbed from inventory"""
     try:
         data = parse_inventory(inventory)
-        generate_testbed(data, output)
+        _, delta = generate_testbed(data, output, return_delta=True)
         click.echo(f"Successfully generated testbed: {output}")
+        click.echo(f"Devices added: {len(delta['added'])}, removed: {len(delta['removed'])}, changed: {len(delta['changed'])}")
+        for kind in ('added', 'removed', 'changed'):
+            for name in delta[kind]:
+                click.echo(f"  {kind}: {name}")
     except Exception as e:
         click.echo(f"Error: {e}", err=True)
         sys.exit(1)
@@ -29,11 +33,22 @@ def init(inventory, output):
 @click.option('--testbed', required=True, help='Path to pyATS testbed file')
 @click.option('--name', required=True, help='Snapshot name')
 @click.option('--output-dir', default='snapshots', help='Directory to save snapshots')
-def capture(testbed, name, output_dir):
+@click.option('--pretty', is_flag=True, help='Write indented JSON documents')
+@click.option('--max-concurrency', default=16, show_default=True, help='Upper bound on devices captured at once')
+@click.option('--role-cap', multiple=True, help='Limit devices of a role in flight, e.g. firewall=2 (repeatable)')
+def capture(testbed, name, output_dir, pretty, max_concurrency, role_cap):
     """Capture a new network snapshot"""
+    role_caps = {}
+    for item in role_cap:
+        role, _, cap = item.partition('=')
+        if not role.strip() or not cap.isdigit() or int(cap) < 1:
+            raise click.BadParameter(f"expected ROLE=N with N >= 1, got '{item}'", param_hint='--role-cap')
+        role_caps[role] = int(cap)
+
     try:
         click.echo(f"Starting snapshot capture '{name}'...")
-        snapshot_path = capture_snapshot(testbed, name, output_dir)
+        snapshot_path = capture_snapshot(testbed, name, output_dir, pretty=pretty,
+                                         max_concurrency=max_concurrency, role_caps=role_caps)
         click.echo(f"Snapshot saved to: {snapshot_path}")
     except Exception as e:
         click.echo(f"Error capturing snapshot: {e}", err=True)
@@ -52,28 +67,140 @@ def diff(baseline, current):
         sys.exit(1)
         
 @cli.command()
-@click.option('--testbed', required=True, help='Path to pyATS testbed file')
-@click.option('--baseline', required=True, help='Path to baseline snapshot directory')
-def validate(testbed, baseline):
-    """Validate current state against baseline (Capture + Diff)"""
-    # This would involve taking a temporary snapshot and comparing it
-    # For now, let's just stick to the requested commands structure 
-    # capturing to a temp dir or just a new timestamped one and comparing.
-    
-    import shutil
-    
+@click.option('--testbed', help='Path to pyATS testbed file')
+@click.option('--baseline', required=True, multiple=True, help='Path to baseline snapshot directory (repeatable)')
+@click.option('--current', help='Existing snapshot to validate instead of capturing a new one')
+def validate(testbed, baseline, current):
+    """Validate current state against one or more baselines (Capture + Diff)"""
+    if not testbed and not current:
+        click.echo("Error: either --testbed or --current is required", err=True)
+        sys.exit(1)
+
     try:
-        current_name = f"validation_run"
-        click.echo("Capturing current state for validation...")
-        current_path = capture_snapshot(testbed, current_name)
-        
-        click.echo(f"Comparing against baseline: {baseline}")
-        compare_data = compare_snapshots(baseline, current_path)
-        generate_console_report(compare_data)
-        
+        if current:
+            current_path = current
+        else:
+            current_name = f"validation_run"
+            click.echo("Capturing current state for validation...")
+            current_path = capture_snapshot(testbed, current_name)
+
+        if len(baseline) == 1:
+            click.echo(f"Comparing against baseline: {baseline[0]}")
+            compare_data = compare_snapshots(baseline[0], current_path)
+            generate_console_report(compare_data)
+        else:
+            click.echo(f"Comparing against {len(baseline)} baselines")
+            generate_consolidated_report(compare_against_baselines(baseline, current_path))
+
     except Exception as e:
         click.echo(f"Error during validation: {e}", err=True)
         sys.exit(1)
 
+@cli.command()
+@click.option('--testbed', required=True, help='Path to pyATS testbed file')
+@click.option('--interval', default=300, show_default=True, help='Seconds between polls of a stable device')
+@click.option('--fast-interval', default=30, show_default=True, help='Seconds between polls of a device that recently changed')
+@click.option('--settle-polls', default=3, show_default=True, help='Stable polls before a changed device returns to the normal interval')
+@click.option('--events', default=None, help='Append change events as JSON lines to this file')
+@click.option('--max-concurrency', default=16, show_default=True, help='Devices polled at once')
+def watch(testbed, interval, fast_interval, settle_polls, events, max_concurrency):
+    """Continuously validate the fleet and report only changes"""
+    from netsnap.watcher import FleetWatcher
+
+    def emit(event):
+        details = f" {event['interface']}: {event.get('from', 'N/A')} -> {event.get('to', 'N/A')}" if 'interface' in event else ''
+        click.echo(f"[{event['timestamp']}] {event['event'].upper()} {event['device']}{details}")
+
+    try:
+        watcher = FleetWatcher(testbed, interval=interval, fast_interval=fast_interval,
+                               settle_polls=settle_polls, events_path=events, emit=emit,
+                               max_workers=max_concurrency)
+        click.echo(f"Watching {len(watcher.devices)} devices (Ctrl+C to stop)...")
+        watcher.run()
+    except KeyboardInterrupt:
+        click.echo("Stopped.")
+    except Exception as e:
+        click.echo(f"Error during watch: {e}", err=True)
+        sys.exit(1)
+
+@cli.command()
+@click.option('--snapshot', required=True, help='Path to snapshot directory')
+@click.option('--interfaces-only', is_flag=True, help='Only interface counts, read from the interface index without parsing device JSON')
+def health(snapshot, interfaces_only):
+    """Show per-device health indicators of a snapshot"""
+    from tabulate import tabulate
+    from netsnap.health_checker import check_snapshot_health, check_interface_health
+
+    try:
+        if interfaces_only:
+            counts = check_interface_health(snapshot)
+            table = [[name, c['interfaces_up'], c['interfaces_down']] for name, c in counts.items()]
+            click.echo(tabulate(table, headers=['Device', 'Interfaces Up', 'Interfaces Down'], tablefmt="simple"))
+            return
+
+        reports = check_snapshot_health(snapshot)
+        table = [[r['hostname'], r['interfaces_up'], r['interfaces_down'], r['cpu_load_5min']] for r in reports]
+        click.echo(tabulate(table, headers=['Device', 'Interfaces Up', 'Interfaces Down', 'CPU 5min'], tablefmt="simple"))
+    except Exception as e:
+        click.echo(f"Error checking snapshot health: {e}", err=True)
+        sys.exit(1)
+
+@cli.command('export')
+@click.option('--snapshot', required=True, help='Path to snapshot directory')
+@click.option('--output', required=True, help='Archive file to write (.tar.gz), or - for stdout')
+def export_(snapshot, output):
+    """Export a snapshot as a single compressed archive"""
+    from netsnap.archive import export_snapshot
+
+    try:
+        if output == '-':
+            export_snapshot(snapshot, click.get_binary_stream('stdout'))
+        else:
+            with open(output, 'wb') as f:
+                export_snapshot(snapshot, f)
+            click.echo(f"Snapshot exported to: {output}")
+    except Exception as e:
+        click.echo(f"Error exporting snapshot: {e}", err=True)
+        sys.exit(1)
+
+@cli.command('import')
+@click.option('--archive', required=True, help='Archive file produced by export, or - for stdin')
+@click.option('--output-dir', default='snapshots', help='Directory to save snapshots')
+def import_(archive, output_dir):
+    """Import a snapshot archive, verifying per-device digests"""
+    from netsnap.archive import import_snapshot
+
+    try:
+        if archive == '-':
+            snapshot_path = import_snapshot(click.get_binary_stream('stdin'), output_dir)
+        else:
+            with open(archive, 'rb') as f:
+                snapshot_path = import_snapshot(f, output_dir)
+        click.echo(f"Snapshot imported to: {snapshot_path}")
+    except Exception as e:
+        click.echo(f"Error importing snapshot: {e}", err=True)
+        sys.exit(1)
+
+@cli.command()
+@click.option('--snapshot', required=True, help='Path to snapshot directory')
+@click.option('--device', default=None, help='Only this device')
+@click.option('--interface', default=None, help='Only this interface name')
+@click.option('--oper-status', default=None, help='Only interfaces with this oper_status (e.g. down)')
+@click.option('--enabled/--disabled', default=None, help='Only administratively enabled/disabled interfaces')
+def query(snapshot, device, interface, oper_status, enabled):
+    """Query interfaces across the fleet using the snapshot's interface index"""
+    from tabulate import tabulate
+    from netsnap.interface_index import load_index, query_interfaces
+
+    try:
+        rows = query_interfaces(load_index(snapshot), device=device, interface=interface,
+                                oper_status=oper_status, enabled=enabled)
+        table = [[r['device'], r['interface'], r['oper_status'], r['enabled'], r['line_protocol']] for r in rows]
+        click.echo(tabulate(table, headers=['Device', 'Interface', 'Oper Status', 'Enabled', 'Line Protocol'], tablefmt="simple"))
+        click.echo(f"\n{len(rows)} interfaces matched")
+    except Exception as e:
+        click.echo(f"Error querying snapshot: {e}", err=True)
+        sys.exit(1)
+
 if __name__ == '__main__':
     cli()
@@ -1,71 +1,179 @@
 from deepdiff import DeepDiff
-import json
 import os
+from netsnap import serializer
+from netsnap.interface_index import load_index, oper_status_map
 
-def compare_snapshots(baseline_dir, current_dir):
+def _device_files(snapshot_dir):
     """
-    Compares two snapshot directories.
-    
-    Args:
-        baseline_dir (str): Path to baseline snapshot directory.
-        current_dir (str): Path to current snapshot directory.
-        
+    Lists the per-device JSON files of a snapshot directory.
+    """
+    return [f for f in os.listdir(snapshot_dir) if f.endswith('.json') and f != 'metadata.json']
+
+def _load_device(snapshot_dir, filename):
+    return serializer.load(os.path.join(snapshot_dir, filename))
+
+def compare_device(base_data, curr_data):
+    """
+    Compares two decoded device documents.
+
     Returns:
-        dict: Differences report.
+        list: Interface deviations (empty when the device matches).
+    """
+    # Compare Interfaces
+    # We focus on op_status changes as per PRD
+    base_intf = base_data.get('interfaces', {})
+    curr_intf = curr_data.get('interfaces', {})
+
+    intf_diffs = []
+
+    # Check for state changes
+    for intf, details in base_intf.items():
+        if intf not in curr_intf:
+            intf_diffs.append({'interface': intf, 'change': 'Interface missing'})
+            continue
+
+        base_state = details.get('oper_status')
+        curr_state = curr_intf[intf].get('oper_status')
+
+        if base_state != curr_state:
+            intf_diffs.append({
+                'interface': intf,
+                'change': 'oper_status',
+                'from': base_state,
+                'to': curr_state
+            })
+
+    return intf_diffs
+
+def _index_status(snapshot_dir):
+    index = load_index(snapshot_dir, build=False)
+    return oper_status_map(index) if index is not None else None
+
+def _compare_indexed(baseline_dir, current_dir, baseline_files, base_index, current_status):
+    """
+    Compares interface oper_status using the columnar indexes of both
+    snapshots, without parsing device JSON.
     """
     report = {
         'baseline': baseline_dir,
         'current': current_dir,
+        'devices_checked': len(baseline_files),
         'deviations': {}
     }
-    
-    # Load metadata to get device list? Or just iterate files.
-    # We'll iterate files in baseline and check against current.
-    
-    baseline_files = [f for f in os.listdir(baseline_dir) if f.endswith('.json') and f != 'metadata.json']
-    
+    current_files = set(_device_files(current_dir))
+
+    base_by_device = {}
+    for (device, intf), state in oper_status_map(base_index).items():
+        base_by_device.setdefault(device, []).append((intf, state))
+
     for filename in baseline_files:
         device_name = filename.replace('.json', '')
-        
-        base_path = os.path.join(baseline_dir, filename)
-        curr_path = os.path.join(current_dir, filename)
-        
-        if not os.path.exists(curr_path):
+
+        if filename not in current_files:
             report['deviations'][device_name] = {'error': 'Device missing in current snapshot'}
             continue
-            
-        with open(base_path, 'r') as f:
-            base_data = json.load(f)
-        with open(curr_path, 'r') as f:
-            curr_data = json.load(f)
-            
-        # Compare Interfaces
-        # We focus on op_status changes as per PRD
-        base_intf = base_data.get('interfaces', {})
-        curr_intf = curr_data.get('interfaces', {})
-        
+
         intf_diffs = []
-        
-        # Check for state changes
-        for intf, details in base_intf.items():
-            if intf not in curr_intf:
+        for intf, base_state in base_by_device.get(device_name, []):
+            if (device_name, intf) not in current_status:
                 intf_diffs.append({'interface': intf, 'change': 'Interface missing'})
                 continue
-                
-            base_state = details.get('oper_status')
-            curr_state = curr_intf[intf].get('oper_status')
-            
+
+            curr_state = current_status[(device_name, intf)]
             if base_state != curr_state:
                 intf_diffs.append({
-                    'interface': intf, 
-                    'change': 'oper_status', 
-                    'from': base_state, 
+                    'interface': intf,
+                    'change': 'oper_status',
+                    'from': base_state,
                     'to': curr_state
                 })
-                
+
+        if intf_diffs:
+            report['deviations'][device_name] = {'interfaces': intf_diffs}
+
+    return report
+
+def _compare_loaded(baseline_dir, current_dir, current_docs, current_status=None):
+    """
+    Compares a baseline directory against already-decoded current documents.
+
+    Args:
+        baseline_dir (str): Path to baseline snapshot directory.
+        current_dir (str): Path to current snapshot directory (for the report).
+        current_docs (dict): Decoded current device documents keyed by filename.
+            Missing entries are loaded from current_dir on demand and cached.
+        current_status (dict, optional): oper_status map from the current
+            snapshot's interface index; used when the baseline has one too.
+    """
+    baseline_files = _device_files(baseline_dir)
+
+    if current_status is not None:
+        base_index = load_index(baseline_dir, build=False)
+        if base_index is not None:
+            return _compare_indexed(baseline_dir, current_dir, baseline_files, base_index, current_status)
+
+    report = {
+        'baseline': baseline_dir,
+        'current': current_dir,
+        'devices_checked': len(baseline_files),
+        'deviations': {}
+    }
+
+    # We iterate files in baseline and check against current.
+    for filename in baseline_files:
+        device_name = filename.replace('.json', '')
+
+        if filename not in current_docs:
+            if not os.path.exists(os.path.join(current_dir, filename)):
+                report['deviations'][device_name] = {'error': 'Device missing in current snapshot'}
+                continue
+            current_docs[filename] = _load_device(current_dir, filename)
+
+        base_data = _load_device(baseline_dir, filename)
+        intf_diffs = compare_device(base_data, current_docs[filename])
+
         if intf_diffs:
             if device_name not in report['deviations']:
                 report['deviations'][device_name] = {}
             report['deviations'][device_name]['interfaces'] = intf_diffs
-            
+
     return report
+
+def compare_snapshots(baseline_dir, current_dir):
+    """
+    Compares two snapshot directories.
+
+    Args:
+        baseline_dir (str): Path to baseline snapshot directory.
+        current_dir (str): Path to current snapshot directory.
+
+    Returns:
+        dict: Differences report.
+    """
+    return _compare_loaded(baseline_dir, current_dir, {}, _index_status(current_dir))
+
+def compare_against_baselines(baseline_dirs, current_dir):
+    """
+    Compares one current snapshot against several baselines.
+
+    Each current device document (or the current interface index) is
+    decoded at most once and shared by every comparison, so N baselines
+    cost N diffs rather than N loads of the current snapshot.
+
+    Args:
+        baseline_dirs (list): Paths to baseline snapshot directories.
+        current_dir (str): Path to current snapshot directory.
+
+    Returns:
+        dict: Consolidated report with one differences report per baseline.
+    """
+    current_docs = {}
+    current_status = _index_status(current_dir)
+    reports = [_compare_loaded(baseline_dir, current_dir, current_docs, current_status) for baseline_dir in baseline_dirs]
+
+    return {
+        'current': current_dir,
+        'baselines': list(baseline_dirs),
+        'compliant': all(not r['deviations'] for r in reports),
+        'reports': reports
+    }
@@ -1,4 +1,8 @@
 import logging
+import os
+import numpy as np
+from netsnap import serializer
+from netsnap.interface_index import load_index
 
 logger = logging.getLogger(__name__)
 
@@ -38,3 +42,55 @@ def check_health(snapshot_data):
         health_report['cpu_load_5min'] = cpu_data
         
     return health_report
+
+def check_snapshot_health(snapshot_dir):
+    """
+    Runs check_health over every device document in a snapshot directory.
+    
+    Args:
+        snapshot_dir (str): Path to the snapshot directory.
+        
+    Returns:
+        list: Health indicators per device.
+    """
+    reports = []
+    for filename in _healthy_device_files(snapshot_dir):
+        reports.append(check_health(serializer.load(os.path.join(snapshot_dir, filename))))
+    return reports
+
+def _healthy_device_files(snapshot_dir):
+    return [f for f in sorted(os.listdir(snapshot_dir))
+            if f.endswith('.json') and f != 'metadata.json' and not f.endswith('_error.json')]
+
+def check_interface_health(snapshot_dir):
+    """
+    Counts up/down interfaces per device from the snapshot's interface index,
+    applying the same admin-down exclusion as check_health. Covers the same
+    devices as check_snapshot_health; devices without interfaces report 0/0.
+    
+    Args:
+        snapshot_dir (str): Path to the snapshot directory.
+        
+    Returns:
+        dict: Device name to {'interfaces_up', 'interfaces_down'}.
+    """
+    health = {
+        f[:-len('.json')]: {'interfaces_up': 0, 'interfaces_down': 0}
+        for f in _healthy_device_files(snapshot_dir)
+    }
+    
+    index = load_index(snapshot_dir)
+    devices = index['device']
+    if len(devices) == 0:
+        return health
+    admin_down = ~index['enabled'] | (np.char.find(index['line_protocol'], 'administratively down') >= 0)
+    up = index['oper_status'] == 'up'
+    down = (index['oper_status'] == 'down') & ~admin_down
+    
+    names, inverse = np.unique(devices, return_inverse=True)
+    up_counts = np.bincount(inverse, weights=up, minlength=len(names)).astype(int)
+    down_counts = np.bincount(inverse, weights=down, minlength=len(names)).astype(int)
+    
+    for name, u, d in zip(names.tolist(), up_counts, down_counts):
+        health[name] = {'interfaces_up': int(u), 'interfaces_down': int(d)}
+    return health
@@ -0,0 +1,122 @@
+import os
+import numpy as np
+from netsnap import serializer
+
+INDEX_FILE = 'interfaces.npz'
+COUNTERS = ('in_errors', 'out_errors', 'in_crc_errors')
+
+class IndexBuilder:
+    """
+    Accumulates interface rows one device at a time, so a capture can build
+    the index without keeping device documents in memory.
+    """
+
+    def __init__(self):
+        self.rows = {
+            'device': [],
+            'interface': [],
+            'oper_status': [],
+            'enabled': [],
+            'line_protocol': []
+        }
+        for counter in COUNTERS:
+            self.rows[counter] = []
+
+    def add_device(self, device_name, device_snapshot):
+        for intf, details in (device_snapshot.get('interfaces') or {}).items():
+            if not isinstance(details, dict):
+                continue
+            counters = details.get('counters') or {}
+            self.rows['device'].append(device_name)
+            self.rows['interface'].append(intf)
+            self.rows['oper_status'].append(details.get('oper_status') or '')
+            self.rows['enabled'].append(details.get('enabled') is not False)
+            self.rows['line_protocol'].append(details.get('line_protocol') or '')
+            for counter in COUNTERS:
+                self.rows[counter].append(int(counters.get(counter) or 0))
+
+    def columns(self):
+        columns = {}
+        for name, values in self.rows.items():
+            if name == 'enabled':
+                columns[name] = np.array(values, dtype=bool)
+            elif name in COUNTERS:
+                columns[name] = np.array(values, dtype=np.int64)
+            else:
+                columns[name] = np.array(values, dtype=str) if values else np.array([], dtype='U1')
+        return columns
+
+    def write(self, snapshot_dir):
+        path = os.path.join(snapshot_dir, INDEX_FILE)
+        np.savez_compressed(path, **self.columns())
+        return path
+
+def build_index(snapshot_dir):
+    """
+    Builds and writes the interface index of a snapshot from its JSON files.
+
+    Returns:
+        str: Path to the index file.
+    """
+    builder = IndexBuilder()
+    for filename in sorted(os.listdir(snapshot_dir)):
+        if not filename.endswith('.json') or filename == 'metadata.json' or filename.endswith('_error.json'):
+            continue
+        builder.add_device(filename[:-len('.json')], serializer.load(os.path.join(snapshot_dir, filename)))
+    return builder.write(snapshot_dir)
+
+def load_index(snapshot_dir, build=True):
+    """
+    Loads the columnar interface index of a snapshot.
+
+    Args:
+        snapshot_dir (str): Path to the snapshot directory.
+        build (bool): Build the index from the JSON files if it is missing.
+
+    Returns:
+        dict: Column name to NumPy array, or None if missing and build is False.
+    """
+    path = os.path.join(snapshot_dir, INDEX_FILE)
+    if not os.path.exists(path):
+        if not build:
+            return None
+        build_index(snapshot_dir)
+    with np.load(path, allow_pickle=False) as data:
+        return {name: data[name] for name in data.files}
+
+def query_interfaces(index, device=None, interface=None, oper_status=None, enabled=None):
+    """
+    Filters an interface index.
+
+    Args:
+        index (dict): Index returned by load_index.
+        device (str, optional): Exact device name.
+        interface (str, optional): Exact interface name.
+        oper_status (str, optional): Operational status, e.g. 'down'.
+        enabled (bool, optional): Administrative state.
+
+    Returns:
+        list: Matching rows as dictionaries.
+    """
+    mask = np.ones(len(index['device']), dtype=bool)
+    if device is not None:
+        mask &= index['device'] == device
+    if interface is not None:
+        mask &= index['interface'] == interface
+    if oper_status is not None:
+        mask &= index['oper_status'] == oper_status
+    if enabled is not None:
+        mask &= index['enabled'] == enabled
+
+    selected = {name: column[mask].tolist() for name, column in index.items()}
+    return [dict(zip(selected, values)) for values in zip(*selected.values())]
+
+def oper_status_map(index):
+    """
+    Maps (device, interface) to oper_status (None when not reported).
+    """
+    return {
+        (dev, intf): status or None
+        for dev, intf, status in zip(index['device'].tolist(), index['interface'].tolist(),
+                                     index['oper_status'].tolist())
+    }
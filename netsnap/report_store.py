@@ -0,0 +1,123 @@
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from netsnap import serializer
+
+def report_id_for(baseline_dir, current_dir):
+    """
+    Builds the deterministic report id for a baseline/current pair.
+    """
+    baseline = os.path.basename(os.path.normpath(baseline_dir))
+    current = os.path.basename(os.path.normpath(current_dir))
+    return f"{baseline}__{current}"
+
+def _report_dir(report_id, reports_dir):
+    return os.path.join(reports_dir, os.path.basename(report_id))
+
+def report_exists(report_id, reports_dir='reports'):
+    return os.path.exists(os.path.join(_report_dir(report_id, reports_dir), 'summary.json'))
+
+def save_report(diff_report, reports_dir='reports'):
+    """
+    Persists a differences report split into summary, device index and
+    per-device detail documents, so readers never need the whole report.
+    The report is built in a staging directory and renamed into place,
+    replacing any previous report with the same id.
+
+    Args:
+        diff_report (dict): Report returned by compare_snapshots.
+        reports_dir (str): Directory to save reports.
+
+    Returns:
+        str: The report id.
+    """
+    report_id = report_id_for(diff_report['baseline'], diff_report['current'])
+    os.makedirs(reports_dir, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix='.report-', dir=reports_dir)
+    try:
+        _write_report(diff_report, report_id, staging)
+
+        report_dir = _report_dir(report_id, reports_dir)
+        if os.path.exists(report_dir):
+            # Move the old report aside first: rename cannot replace a non-empty directory
+            retired = tempfile.mkdtemp(prefix='.retired-', dir=reports_dir)
+            os.rename(report_dir, os.path.join(retired, 'report'))
+            os.rename(staging, report_dir)
+            shutil.rmtree(retired, ignore_errors=True)
+        else:
+            os.rename(staging, report_dir)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    return report_id
+
+def _write_report(diff_report, report_id, report_dir):
+    devices_dir = os.path.join(report_dir, 'devices')
+    os.makedirs(devices_dir)
+
+    deviations = diff_report.get('deviations', {})
+    index = []
+    interface_changes = 0
+    for device in sorted(deviations):
+        changes = deviations[device]
+        changed = len(changes.get('interfaces', []))
+        interface_changes += changed
+        index.append({
+            'device': device,
+            'error': changes.get('error'),
+            'interface_changes': changed
+        })
+        serializer.dump(dict(changes, device=device), os.path.join(devices_dir, f"{device}.json"))
+
+    serializer.dump(index, os.path.join(report_dir, 'devices.json'))
+
+    summary = {
+        'report_id': report_id,
+        'generated': datetime.utcnow().isoformat() + 'Z',
+        'baseline': diff_report['baseline'],
+        'current': diff_report['current'],
+        'devices_checked': diff_report.get('devices_checked', len(index)),
+        'devices_affected': len(index),
+        'interface_changes': interface_changes,
+        'status': 'fail' if index else 'pass'
+    }
+    serializer.dump(summary, os.path.join(report_dir, 'summary.json'))
+
+def load_summary(report_id, reports_dir='reports'):
+    """
+    Loads the summary of a persisted report.
+    """
+    return serializer.load(os.path.join(_report_dir(report_id, reports_dir), 'summary.json'))
+
+def list_devices(report_id, page=1, per_page=50, reports_dir='reports'):
+    """
+    Returns one page of the affected-device index of a persisted report.
+
+    Returns:
+        dict: page, per_page, total, pages and the device rows for the page.
+    """
+    index = serializer.load(os.path.join(_report_dir(report_id, reports_dir), 'devices.json'))
+    total = len(index)
+    pages = max(1, (total + per_page - 1) // per_page)
+    page = min(max(1, page), pages)
+    start = (page - 1) * per_page
+
+    return {
+        'page': page,
+        'per_page': per_page,
+        'total': total,
+        'pages': pages,
+        'devices': index[start:start + per_page]
+    }
+
+def load_device(report_id, device, reports_dir='reports'):
+    """
+    Loads the deviation detail of one device in a persisted report.
+
+    Raises:
+        FileNotFoundError: If the device has no deviations in the report.
+    """
+    path = os.path.join(_report_dir(report_id, reports_dir), 'devices', f"{os.path.basename(device)}.json")
+    return serializer.load(path)
@@ -30,3 +30,22 @@ def generate_console_report(diff_report):
                 
             print(tabulate(table_data, headers=['Interface', 'Change', 'From', 'To'], tablefmt="simple"))
         print("-" * 40)
+
+def generate_consolidated_report(multi_report):
+    """
+    Generates a console report for a multi-baseline validation run.
+    """
+    reports = multi_report.get('reports', [])
+    failed = [r for r in reports if r.get('deviations')]
+
+    print("\n=== Consolidated Validation Report ===")
+    print(f"Current:   {multi_report['current']}")
+    print(f"Baselines: {len(reports)} checked, {len(failed)} with deviations")
+
+    summary = []
+    for r in reports:
+        summary.append([r['baseline'], len(r.get('deviations', {})), 'FAIL' if r.get('deviations') else 'PASS'])
+    print(tabulate(summary, headers=['Baseline', 'Devices Affected', 'Result'], tablefmt="simple"))
+
+    for r in reports:
+        generate_console_report(r)
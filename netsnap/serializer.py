@@ -0,0 +1,56 @@
+import json
+
+try:
+    import orjson
+except ImportError:  # optional fast backend
+    orjson = None
+
+BACKEND = 'orjson' if orjson else 'json'
+
+def dumps(data, pretty=False):
+    """
+    Serializes data to JSON bytes.
+
+    Args:
+        data: JSON-compatible object.
+        pretty (bool): Indent output for human reading. Compact by default.
+
+    Returns:
+        bytes: Encoded JSON document.
+    """
+    if orjson:
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, option=option)
+
+    if pretty:
+        return json.dumps(data, indent=2).encode('utf-8')
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+def loads(raw):
+    """
+    Parses a JSON document from bytes or str.
+    """
+    if orjson:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def dump(data, path, pretty=False):
+    """
+    Writes data as JSON to path.
+
+    Returns:
+        bytes: The encoded document that was written.
+    """
+    raw = dumps(data, pretty=pretty)
+    with open(path, 'wb') as f:
+        f.write(raw)
+    return raw
+
+def load(path):
+    """
+    Reads a JSON document from path.
+    """
+    with open(path, 'rb') as f:
+        return loads(f.read())
@@ -2,19 +2,190 @@ import logging
 from genie.testbed import load
 from pyats.topology import Testbed
 from datetime import datetime
-import json
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import hashlib
 import os
+import time
+from netsnap import serializer
+from netsnap.interface_index import IndexBuilder
 
 logger = logging.getLogger(__name__)
 
-def capture_snapshot(testbed_path, snapshot_name, output_dir='snapshots'):
+def collect_device_state(device):
+    """
+    Collects the operational state of a connected device.
+    
+    Args:
+        device: A connected pyATS device.
+        
+    Returns:
+        dict: Device snapshot document.
+    """
+    name = device.name
+    
+    # 1. Interface Health
+    logger.info(f"Collecting interface operational state for {name}...")
+    interfaces = device.parse('show interfaces')
+    
+    # 2. Device Health
+    # Note: These commands are IOS-XE specific in the example. 
+    # Ideally we'd use platform-agnostic Genie parsers or check OS.
+    logger.info(f"Collecting CPU usage for {name}...")
+    cpu = {}
+    if device.os in ['iosxe', 'ios']:
+        cpu = device.parse('show processes cpu')
+    # Add more OS checks or use generic if available
+    
+    logger.info(f"Collecting memory usage for {name}...")
+    memory = {}
+    if device.os in ['iosxe', 'ios']:
+        memory = device.parse('show processes memory') # simplified command
+    
+    # Combine into device snapshot
+    return {
+        'hostname': name,
+        'interfaces': interfaces,
+        'cpu': cpu,
+        'memory': memory
+    }
+
+def normalize_role(role):
+    """
+    Normalizes an inventory role / testbed device type for role caps.
+    """
+    return (role or '').strip().lower()
+
+class ConcurrencyWindow:
+    """
+    AIMD concurrency window driven by observed connect behaviour.
+    
+    Every fast successful connect grows the window by 1/size (about +1 per
+    round trip of the window); an auth failure, a timeout or a connect
+    slower than `latency_target` seconds halves it, at most once per round
+    trip: congestion reported by sessions started before the last decrease
+    is ignored. Per-role caps bound how many devices of one inventory role
+    are in flight at once.
+    """
+    
+    def __init__(self, initial=4, maximum=16, minimum=1, latency_target=15.0, role_caps=None):
+        self.maximum = max(minimum, maximum)
+        self.minimum = minimum
+        self.size = float(min(max(initial, minimum), self.maximum))
+        self.latency_target = latency_target
+        self.role_caps = {}
+        for role, cap in (role_caps or {}).items():
+            if int(cap) < 1:
+                raise ValueError(f"Role cap for '{role}' must be at least 1")
+            self.role_caps[normalize_role(role)] = int(cap)
+        self.peak = self.size
+        self.decreases = 0
+        self.latencies = []
+        self.started = 0
+        self.decreased_at = 0  # sessions started before this already saw the last cut
+        
+    @property
+    def limit(self):
+        return int(self.size)
+        
+    def role_allows(self, role, in_flight):
+        cap = self.role_caps.get(normalize_role(role))
+        return cap is None or in_flight.get(role, 0) < cap
+        
+    def start(self):
+        """
+        Registers a new session.
+        
+        Returns:
+            int: Ticket to pass back to record().
+        """
+        ticket = self.started
+        self.started += 1
+        return ticket
+        
+    def record(self, ticket, connect_latency=None, failure=None):
+        """
+        Feeds one connect outcome into the window.
+        
+        Args:
+            ticket (int): Value returned by start() for this session.
+            connect_latency (float, optional): Seconds taken to connect.
+            failure (str, optional): 'auth', 'timeout' or 'error'.
+        """
+        if connect_latency is not None:
+            self.latencies.append(connect_latency)
+            
+        congested = failure in ('auth', 'timeout') or (
+            connect_latency is not None and connect_latency > self.latency_target)
+        if congested:
+            if ticket >= self.decreased_at:
+                self.size = max(self.minimum, self.size / 2)
+                self.decreases += 1
+                self.decreased_at = self.started
+        elif failure is None:
+            self.size = min(self.maximum, self.size + 1 / self.size)
+            self.peak = max(self.peak, self.size)
+            
+    def summary(self):
+        latencies = sorted(self.latencies)
+        return {
+            'final': self.limit,
+            'peak': int(self.peak),
+            'maximum': self.maximum,
+            'decreases': self.decreases,
+            'role_caps': self.role_caps,
+            'median_connect_seconds': round(latencies[len(latencies) // 2], 3) if latencies else None
+        }
+
+def _classify_failure(error):
+    message = str(error).lower()
+    if any(word in message for word in ('auth', 'login', 'password', 'permission denied')):
+        return 'auth'
+    if isinstance(error, TimeoutError) or 'timeout' in message or 'timed out' in message:
+        return 'timeout'
+    return 'error'
+
+def _capture_device(name, device):
+    """
+    Connects to one device and collects its state.
+    
+    Returns:
+        tuple: (device_snapshot or None, connect latency or None, failure kind or None, error)
+    """
+    logger.info(f"Connecting to {name}...")
+    start = time.monotonic()
+    try:
+        device.connect(log_stdout=False)
+    except Exception as e:
+        return None, None, _classify_failure(e), e
+    connect_latency = time.monotonic() - start
+    
+    try:
+        device_snapshot = collect_device_state(device)
+    except Exception as e:
+        return None, connect_latency, 'error', e
+    finally:
+        try:
+            device.disconnect()
+        except Exception:
+            pass
+    return device_snapshot, connect_latency, None, None
+
+def capture_snapshot(testbed_path, snapshot_name, output_dir='snapshots', pretty=False,
+                     max_concurrency=16, initial_concurrency=4, role_caps=None):
     """
     Captures a snapshot of the network state.
     
+    Devices are captured in parallel; the number in flight adapts to connect
+    latency, auth failures and timeouts (see ConcurrencyWindow).
+    
     Args:
         testbed_path (str): Path to the testbed YAML file.
         snapshot_name (str): Name of the snapshot.
         output_dir (str): Directory to save snapshots.
+        pretty (bool): Write indented JSON instead of compact JSON.
+        max_concurrency (int): Upper bound on devices captured at once.
+        initial_concurrency (int): Starting concurrency window.
+        role_caps (dict, optional): Maximum devices in flight per inventory role.
     """
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
@@ -30,61 +201,61 @@ def capture_snapshot(testbed_path, snapshot_name, output_dir='snapshots'):
         'timestamp': datetime.utcnow().isoformat() + 'Z',
         'device_count': len(testbed.devices),
         'status': 'in_progress',
-        'devices': list(testbed.devices.keys())
+        'devices': list(testbed.devices.keys()),
+        'digests': {}
     }
     
+    index = IndexBuilder()
+    window = ConcurrencyWindow(initial=initial_concurrency, maximum=max_concurrency, role_caps=role_caps)
+    
     # Save initial metadata
-    with open(os.path.join(snapshot_dir, 'metadata.json'), 'w') as f:
-        json.dump(metadata, f, indent=2)
-        
-    for name, device in testbed.devices.items():
-        logger.info(f"Connecting to {name}...")
-        try:
-            device.connect(log_stdout=False)
-            
-            # 1. Interface Health
-            logger.info(f"Collecting interface operational state for {name}...")
-            interfaces = device.parse('show interfaces')
-            
-            # 2. Device Health
-            # Note: These commands are IOS-XE specific in the example. 
-            # Ideally we'd use platform-agnostic Genie parsers or check OS.
-            logger.info(f"Collecting CPU usage for {name}...")
-            cpu = {}
-            if device.os in ['iosxe', 'ios']:
-                cpu = device.parse('show processes cpu')
-            # Add more OS checks or use generic if available
-            
-            logger.info(f"Collecting memory usage for {name}...")
-            memory = {}
-            if device.os in ['iosxe', 'ios']:
-                memory = device.parse('show processes memory') # simplified command
-            
-            # Combine into device snapshot
-            device_snapshot = {
-                'hostname': name,
-                'interfaces': interfaces,
-                'cpu': cpu,
-                'memory': memory
-            }
-            
-            # Save device snapshot
-            with open(os.path.join(snapshot_dir, f"{name}.json"), 'w') as f:
-                json.dump(device_snapshot, f, indent=2)
+    serializer.dump(metadata, os.path.join(snapshot_dir, 'metadata.json'), pretty=pretty)
+    
+    pending = list(testbed.devices.items())
+    running = {}
+    in_flight = {}
+    
+    with ThreadPoolExecutor(max_workers=window.maximum) as executor:
+        while pending or running:
+            # Start devices while the window and their role caps allow
+            for name, device in list(pending):
+                if len(running) >= window.limit:
+                    break
+                role = normalize_role(device.type)
+                if not window.role_allows(role, in_flight):
+                    continue
+                pending.remove((name, device))
+                in_flight[role] = in_flight.get(role, 0) + 1
+                running[executor.submit(_capture_device, name, device)] = (name, role, window.start())
                 
-            device.disconnect()
-            
-        except Exception as e:
-            logger.error(f"Failed to capture snapshot for {name}: {e}")
-            device_snapshot = {
-                'hostname': name,
-                'error': str(e)
-            }
-            with open(os.path.join(snapshot_dir, f"{name}_error.json"), 'w') as f:
-                json.dump(device_snapshot, f, indent=2)
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, role, ticket = running.pop(future)
+                in_flight[role] -= 1
+                device_snapshot, connect_latency, failure, error = future.result()
+                window.record(ticket, connect_latency, failure)
+                
+                if device_snapshot is not None:
+                    # Save device snapshot
+                    filename = f"{name}.json"
+                    raw = serializer.dump(device_snapshot, os.path.join(snapshot_dir, filename), pretty=pretty)
+                    metadata['digests'][filename] = hashlib.sha256(raw).hexdigest()
+                    index.add_device(name, device_snapshot)
+                else:
+                    logger.error(f"Failed to capture snapshot for {name}: {error}")
+                    device_snapshot = {
+                        'hostname': name,
+                        'error': str(error)
+                    }
+                    filename = f"{name}_error.json"
+                    raw = serializer.dump(device_snapshot, os.path.join(snapshot_dir, filename), pretty=pretty)
+                    metadata['digests'][filename] = hashlib.sha256(raw).hexdigest()
 
+    # Columnar interface index for fleet-wide queries without JSON parsing
+    index.write(snapshot_dir)
+    
     metadata['status'] = 'completed'
-    with open(os.path.join(snapshot_dir, 'metadata.json'), 'w') as f:
-        json.dump(metadata, f, indent=2)
+    metadata['concurrency'] = window.summary()
+    serializer.dump(metadata, os.path.join(snapshot_dir, 'metadata.json'), pretty=pretty)
         
     return snapshot_dir
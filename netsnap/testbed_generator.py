@@ -1,53 +1,124 @@
 import yaml
 import os
+import tempfile
 
-def generate_testbed(inventory_data, output_path=None):
+def _device_entry(device):
+    """
+    Builds the testbed entry for one inventory device.
+    """
+    # Determine OS based on role or default (user can enhance this mapping)
+    # For now, defaulting to iosxe for 'router'/'switch' if not specified,
+    # or we could require 'os' in inventory. PRD implies minimal columns.
+    # We'll map role to likely OS or generic.
+    dev_role = device['role']
+    dev_os = 'iosxe' # Default
+    if 'nxos' in dev_role:
+        dev_os = 'nxos'
+    elif 'asa' in dev_role or 'firewall' in dev_role:
+         dev_os = 'asa'
+
+    return {
+        'type': dev_role,
+        'os': dev_os,
+        'connections': {
+            'cli': {
+                'protocol': 'ssh',
+                'ip': device['ip']
+            }
+        },
+        'credentials': {
+            'default': {
+                'username': '%ENV{NETWORK_USER}',
+                'password': '%ENV{NETWORK_PASS}'
+            }
+        }
+    }
+
+def _entry_key(entry):
+    # Inventory columns that feed an entry: hostname (the key), ip and role
+    return (entry.get('type'), entry.get('connections', {}).get('cli', {}).get('ip'))
+
+def diff_testbeds(old_testbed, new_testbed):
+    """
+    Computes the device delta between two testbed dictionaries.
+
+    Args:
+        old_testbed (dict): Previous testbed dictionary.
+        new_testbed (dict): New testbed dictionary.
+
+    Returns:
+        dict: Sorted 'added', 'removed' and 'changed' hostname lists.
+    """
+    old_devices = (old_testbed or {}).get('devices') or {}
+    new_devices = (new_testbed or {}).get('devices') or {}
+
+    return {
+        'added': sorted(set(new_devices) - set(old_devices)),
+        'removed': sorted(set(old_devices) - set(new_devices)),
+        'changed': sorted(name for name in set(old_devices) & set(new_devices)
+                          if _entry_key(old_devices[name]) != _entry_key(new_devices[name]))
+    }
+
+def generate_testbed(inventory_data, output_path=None, return_delta=False):
     """
     Generates a pyATS testbed YAML from inventory data.
-    
+
+    If output_path already holds a testbed, only devices added, removed or
+    changed (by hostname/ip/role) are touched; entries of unchanged devices
+    are kept as they are, and the file is not rewritten when nothing changed.
+
     Args:
         inventory_data (list): List of device dictionaries.
         output_path (str, optional): Path to save the YAML file.
-        
+        return_delta (bool): Also return the delta against the existing testbed.
+
     Returns:
-        dict: The testbed dictionary.
+        dict: The testbed dictionary, or (testbed, delta) if return_delta is set.
     """
-    testbed = {
+    generated = {
         'devices': {}
     }
-    
+
     for device in inventory_data:
-        hostname = device['hostname']
-        # Determine OS based on role or default (user can enhance this mapping)
-        # For now, defaulting to iosxe for 'router'/'switch' if not specified, 
-        # or we could require 'os' in inventory. PRD implies minimal columns.
-        # We'll map role to likely OS or generic.
-        dev_role = device['role']
-        dev_os = 'iosxe' # Default
-        if 'nxos' in dev_role:
-            dev_os = 'nxos'
-        elif 'asa' in dev_role or 'firewall' in dev_role:
-             dev_os = 'asa'
-             
-        testbed['devices'][hostname] = {
-            'type': dev_role,
-            'os': dev_os,
-            'connections': {
-                'cli': {
-                    'protocol': 'ssh',
-                    'ip': device['ip']
-                }
-            },
-            'credentials': {
-                'default': {
-                    'username': '%ENV{NETWORK_USER}',
-                    'password': '%ENV{NETWORK_PASS}'
-                }
-            }
-        }
-        
-    if output_path:
-        with open(output_path, 'w') as f:
-            yaml.dump(testbed, f, default_flow_style=False)
-            
+        generated['devices'][device['hostname']] = _device_entry(device)
+
+    existing = None
+    if output_path and os.path.exists(output_path):
+        with open(output_path, 'r') as f:
+            existing = yaml.safe_load(f)
+
+    delta = diff_testbeds(existing, generated)
+
+    if existing and existing.get('devices'):
+        testbed = existing
+        for name in delta['removed']:
+            del testbed['devices'][name]
+        for name in delta['added'] + delta['changed']:
+            testbed['devices'][name] = generated['devices'][name]
+    else:
+        testbed = generated
+
+    if output_path and (existing is None or any(delta.values())):
+        # Write beside the target and swap it in, so readers such as the
+        # watcher never see a half-written testbed
+        fd, tmp_path = tempfile.mkstemp(prefix='.testbed-', suffix='.yaml',
+                                        dir=os.path.dirname(os.path.abspath(output_path)))
+        try:
+            with os.fdopen(fd, 'w') as f:
+                yaml.dump(testbed, f, default_flow_style=False)
+            # mkstemp creates 0600; keep the mode a plain open() would give
+            if existing is not None:
+                mode = os.stat(output_path).st_mode & 0o777
+            else:
+                umask = os.umask(0)
+                os.umask(umask)
+                mode = 0o666 & ~umask
+            os.chmod(tmp_path, mode)
+            os.replace(tmp_path, output_path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+
+    if return_delta:
+        return testbed, delta
     return testbed
@@ -0,0 +1,282 @@
+import logging
+import heapq
+import os
+import time
+import yaml
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from genie.testbed import load
+
+from netsnap import serializer
+from netsnap.testbed_generator import diff_testbeds
+
+logger = logging.getLogger(__name__)
+
+class FleetWatcher:
+    """
+    Re-checks a fleet on a schedule and reports only state changes.
+
+    The testbed, device connections and the last known state of each device
+    are kept in memory. Each poll is compared with the previous poll of the
+    same device, so a quiet fleet produces no events and no writes.
+    Devices that change are polled at `fast_interval` until they have been
+    stable for `settle_polls` consecutive polls. Only `show interfaces` is
+    run per poll, and due devices are polled `max_workers` at a time.
+
+    When the testbed file is regenerated, only devices added, removed or
+    changed in it are reloaded; other devices keep their connection and state.
+    """
+
+    def __init__(self, testbed_path, interval=300, fast_interval=30, settle_polls=3,
+                 events_path=None, emit=None, max_workers=16):
+        self.testbed_path = testbed_path
+        self.testbed_mtime = os.path.getmtime(testbed_path)
+        with open(testbed_path, 'r') as f:
+            self.testbed_data = yaml.safe_load(f)
+        self.devices = dict(load(testbed_path).devices)
+        self.interval = interval
+        self.fast_interval = fast_interval
+        self.settle_polls = settle_polls
+        self.events_path = events_path
+        self.emit = emit
+        self.max_workers = max(1, max_workers)
+
+        self.previous = {}   # device -> {interface: oper_status} from the last poll
+        self.reference = {}  # device -> {interface: oper_status} when first seen
+        self.active = {}     # device -> {interface: deviation}
+        self.unreachable = set()
+        self.stable_polls = {}
+        self.generation = {}  # device -> bumped whenever its entry is reloaded
+
+    def _event(self, device, kind, **details):
+        event = {
+            'timestamp': datetime.utcnow().isoformat() + 'Z',
+            'device': device,
+            'event': kind,
+        }
+        event.update(details)
+
+        if self.events_path:
+            with open(self.events_path, 'ab') as f:
+                f.write(serializer.dumps(event) + b'\n')
+        if self.emit:
+            self.emit(event)
+        return event
+
+    def _collect(self, name, device):
+        """
+        Reads the interface state of one device. Runs on a worker thread.
+
+        Returns:
+            dict: {interface: oper_status}
+        """
+        if not device.is_connected():
+            device.connect(log_stdout=False)
+        # Only interfaces are compared, so CPU/memory commands are skipped
+        interfaces = device.parse('show interfaces')
+        return {intf: details.get('oper_status') for intf, details in interfaces.items()}
+
+    def poll_device(self, name):
+        """
+        Polls one device and emits events for changes since its previous poll.
+
+        Returns:
+            bool: True when the device changed (or its reachability did).
+        """
+        try:
+            current = self._collect(name, self.devices[name])
+        except Exception as e:
+            return self._record_poll(name, error=e)
+        return self._record_poll(name, current=current)
+
+    def _record_poll(self, name, current=None, error=None):
+        """
+        Applies one poll result to the in-memory state and emits events.
+        Always runs on the polling loop's thread.
+        """
+        if error is not None:
+            device = self.devices[name]
+            logger.error(f"Failed to poll {name}: {error}")
+            # A session that died mid-command can still report connected;
+            # drop it so the next poll dials a fresh one
+            try:
+                device.disconnect()
+            except Exception:
+                pass
+            try:
+                device.destroy()
+            except Exception:
+                pass
+            if name in self.unreachable:
+                return False
+            self.unreachable.add(name)
+            self._event(name, 'unreachable', error=str(error))
+            return True
+
+        changed = False
+        if name in self.unreachable:
+            self.unreachable.discard(name)
+            self._event(name, 'reachable')
+            changed = True
+
+        if name not in self.previous:
+            self.previous[name] = current
+            self.reference[name] = dict(current)
+            self.active[name] = {}
+            return changed
+
+        reference = self.reference[name]
+        active = self.active[name]
+        previous = self.previous[name]
+
+        # Interfaces first seen after the first poll take their state on
+        # first sight as reference, so later changes can clear again
+        for intf, state in current.items():
+            if intf not in previous and intf not in reference:
+                reference[intf] = state
+
+        for intf, prev_state in previous.items():
+            if intf not in current:
+                diff = {'interface': intf, 'change': 'Interface missing'}
+            elif current[intf] != prev_state:
+                diff = {'interface': intf, 'change': 'oper_status', 'from': prev_state, 'to': current[intf]}
+            else:
+                continue
+
+            changed = True
+            state = diff.get('to')
+            if state is not None and state == reference.get(intf):
+                active.pop(intf, None)
+                self._event(name, 'cleared', **diff)
+            else:
+                active[intf] = diff
+                self._event(name, 'deviation', **diff)
+
+        # Interfaces that reappear are not in the previous state
+        for intf in list(active):
+            if intf in current and intf not in previous:
+                if current[intf] == reference.get(intf):
+                    active.pop(intf)
+                    self._event(name, 'cleared', interface=intf, change='Interface restored')
+                    changed = True
+
+        self.previous[name] = current
+        return changed
+
+    def _invalidate(self, name):
+        device = self.devices.pop(name, None)
+        if device is not None:
+            try:
+                if device.is_connected():
+                    device.disconnect()
+            except Exception:
+                pass
+        for state in (self.previous, self.reference, self.active, self.stable_polls):
+            state.pop(name, None)
+        self.unreachable.discard(name)
+        self.generation[name] = self.generation.get(name, 0) + 1
+
+    def refresh_testbed(self):
+        """
+        Reloads the testbed file if it changed since it was last read.
+
+        Returns:
+            list: Devices that were added or reloaded and need polling.
+        """
+        try:
+            mtime = os.path.getmtime(self.testbed_path)
+            if mtime == self.testbed_mtime:
+                return []
+
+            with open(self.testbed_path, 'r') as f:
+                testbed_data = yaml.safe_load(f)
+            if not isinstance(testbed_data, dict):
+                raise ValueError("testbed is empty or not a mapping")
+            delta = diff_testbeds(self.testbed_data, testbed_data)
+
+            reloaded = delta['added'] + delta['changed']
+            testbed = load(self.testbed_path) if reloaded else None
+        except Exception as e:
+            # Keep the previous testbed; mtime is left alone so the next poll retries
+            logger.error(f"Failed to reload testbed {self.testbed_path}: {e}")
+            return []
+
+        self.testbed_mtime = mtime
+        self.testbed_data = testbed_data
+        if not any(delta.values()):
+            return []
+
+        logger.info(f"Testbed changed: {len(delta['added'])} added, "
+                    f"{len(delta['removed'])} removed, {len(delta['changed'])} changed")
+        for name in delta['removed'] + delta['changed']:
+            self._invalidate(name)
+
+        for name in reloaded:
+            self.devices[name] = testbed.devices[name]
+        return reloaded
+
+    def _next_interval(self, name, changed):
+        if changed:
+            self.stable_polls[name] = 0
+        else:
+            self.stable_polls[name] = self.stable_polls.get(name, self.settle_polls) + 1
+
+        if self.stable_polls[name] < self.settle_polls:
+            return self.fast_interval
+        return self.interval
+
+    def run(self, max_polls=None):
+        """
+        Runs the polling loop until interrupted or `max_polls` polls are made.
+
+        Devices that are due at the same time are polled in parallel, up to
+        `max_workers` at once; events and state updates stay on this thread.
+        """
+        now = time.monotonic()
+        schedule = [(now, name, self.generation.get(name, 0)) for name in self.devices]
+        heapq.heapify(schedule)
+        polls = 0
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                while schedule and (max_polls is None or polls < max_polls):
+                    delay = schedule[0][0] - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+
+                    for added in self.refresh_testbed():
+                        heapq.heappush(schedule, (time.monotonic(), added, self.generation.get(added, 0)))
+
+                    # Take every entry that is due now
+                    batch = []
+                    now = time.monotonic()
+                    while schedule and schedule[0][0] <= now:
+                        if max_polls is not None and polls + len(batch) >= max_polls:
+                            break
+                        _, name, generation = heapq.heappop(schedule)
+                        # Entries scheduled before a device was removed or reloaded are stale
+                        if name not in self.devices or generation != self.generation.get(name, 0):
+                            continue
+                        batch.append((name, generation))
+
+                    futures = {
+                        executor.submit(self._collect, name, self.devices[name]): (name, generation)
+                        for name, generation in batch
+                    }
+                    for future in as_completed(futures):
+                        name, generation = futures[future]
+                        try:
+                            changed = self._record_poll(name, current=future.result())
+                        except Exception as e:
+                            changed = self._record_poll(name, error=e)
+                        polls += 1
+                        heapq.heappush(schedule, (time.monotonic() + self._next_interval(name, changed), name, generation))
+        finally:
+            for device in self.devices.values():
+                try:
+                    if device.is_connected():
+                        device.disconnect()
+                except Exception:
+                    pass
+
+        return polls
@@ -1,5 +1,5 @@
 from flask_wtf import FlaskForm
-from wtforms import StringField, PasswordField, SubmitField, BooleanField, SelectField, FileField
+from wtforms import StringField, PasswordField, SubmitField, BooleanField, SelectField, SelectMultipleField, FileField
 from wtforms.validators import DataRequired, EqualTo, ValidationError
 from .models import User
 
@@ -35,5 +35,5 @@ class CaptureForm(FlaskForm):
     submit = SubmitField('Capture Snapshot')
 
 class ValidateForm(FlaskForm):
-    baseline_id = SelectField('Baseline Snapshot', validators=[DataRequired()])
+    baseline_id = SelectMultipleField('Baseline Snapshots', validators=[DataRequired()])
     submit = SubmitField('Validate Current State')
@@ -1,4 +1,4 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request, send_file, current_app
+from flask import Blueprint, render_template, redirect, url_for, flash, request, send_file, current_app, abort, Response, stream_with_context
 from flask_login import login_user, logout_user, login_required, current_user
 from werkzeug.utils import secure_filename
 import os
@@ -13,7 +13,10 @@ from .forms import LoginForm, ChangePasswordForm, AddUserForm, UploadInventoryFo
 from netsnap.inventory_parser import parse_inventory
 from netsnap.testbed_generator import generate_testbed
 from netsnap.snapshot_collector import capture_snapshot
-from netsnap.comparator import compare_snapshots
+from netsnap.comparator import compare_snapshots, compare_against_baselines
+from netsnap import serializer
+from netsnap import report_store
+from netsnap.archive import iter_export
 # Note: Reporting via web might need logic to read JSONs and pass to template
 
 main_bp = Blueprint('main', __name__)
@@ -81,6 +84,15 @@ def manage_users():
 
 # --- Main Routes ---
 
+def _list_snapshots(snapshots_dir='snapshots'):
+    # Newest first; dot-directories are imports still being verified
+    if not os.path.exists(snapshots_dir):
+        return []
+    snapshots = [d for d in os.listdir(snapshots_dir)
+                 if not d.startswith('.') and os.path.isdir(os.path.join(snapshots_dir, d))]
+    snapshots.sort(reverse=True)
+    return snapshots
+
 @main_bp.route('/')
 @main_bp.route('/dashboard')
 @login_required
@@ -88,15 +100,21 @@ def dashboard():
     if current_user.must_change_password:
         return redirect(url_for('auth.change_password'))
         
-    # List snapshots
-    snapshots_dir = 'snapshots'
-    snapshots = []
-    if os.path.exists(snapshots_dir):
-        snapshots = [d for d in os.listdir(snapshots_dir) if os.path.isdir(os.path.join(snapshots_dir, d))]
-        snapshots.sort(reverse=True) # Newest first
+    snapshots = _list_snapshots()
     
     return render_template('dashboard.html', title='Dashboard', snapshots=snapshots)
 
+@main_bp.route('/snapshots/<snapshot_id>/download')
+@login_required
+def download_snapshot(snapshot_id):
+    if snapshot_id not in _list_snapshots():
+        abort(404)
+    snapshot_path = os.path.join('snapshots', snapshot_id)
+    response = Response(stream_with_context(iter_export(snapshot_path)), mimetype='application/gzip')
+    # Werkzeug quotes the name and adds an RFC 5987 filename* for non-ASCII names
+    response.headers.set('Content-Disposition', 'attachment', filename=f"{snapshot_id}.tar.gz")
+    return response
+
 @main_bp.route('/inventory/download-template')
 @login_required
 def download_template():
@@ -130,8 +148,9 @@ def upload_inventory():
         try:
             # Init testbed
             data = parse_inventory(filepath)
-            generate_testbed(data, 'testbed.yaml')
-            flash('Inventory uploaded and testbed initialized successfully.')
+            _, delta = generate_testbed(data, 'testbed.yaml', return_delta=True)
+            flash(f"Inventory uploaded and testbed updated: {len(delta['added'])} added, "
+                  f"{len(delta['removed'])} removed, {len(delta['changed'])} changed.")
         except Exception as e:
             flash(f'Error processing inventory: {str(e)}')
             
@@ -165,31 +184,29 @@ def capture():
 def validate():
     form = ValidateForm()
     # Populate baseline choices
-    snapshots_dir = 'snapshots'
-    choices = []
-    if os.path.exists(snapshots_dir):
-        dirs = [d for d in os.listdir(snapshots_dir) if os.path.isdir(os.path.join(snapshots_dir, d))]
-        dirs.sort(reverse=True)
-        choices = [(d, d) for d in dirs]
-    form.baseline_id.choices = choices
+    form.baseline_id.choices = [(d, d) for d in _list_snapshots()]
     
     if form.validate_on_submit():
         if not os.path.exists('testbed.yaml'):
              flash('No testbed initialized.')
              return redirect(url_for('main.dashboard'))
              
-        baseline_path = os.path.join('snapshots', form.baseline_id.data)
+        baseline_paths = [os.path.join('snapshots', b) for b in form.baseline_id.data]
         
         try:
-            # 1. Capture current state
+            # 1. Capture current state once
             current_name = 'validation_run'
             current_path = capture_snapshot('testbed.yaml', current_name)
             
-            # 2. Compare
-            diff_report = compare_snapshots(baseline_path, current_path)
+            # 2. Compare against every selected baseline
+            multi_report = compare_against_baselines(baseline_paths, current_path)
             
-            # 3. Render Report
-            return render_template('report.html', title='Validation Report', report=diff_report)
+            # 3. Persist and render the summary; device detail is loaded on demand
+            report_ids = [report_store.save_report(r) for r in multi_report['reports']]
+            if len(report_ids) == 1:
+                return redirect(url_for('main.report_summary', report_id=report_ids[0]))
+            summaries = [report_store.load_summary(rid) for rid in report_ids]
+            return render_template('report.html', title='Validation Report', summaries=summaries)
             
         except Exception as e:
             flash(f'Error during validation: {str(e)}')
@@ -200,17 +217,75 @@ def validate():
 @main_bp.route('/report/<path:baseline>/<path:current>')
 @login_required
 def view_report(baseline, current):
-    # Retrieve a past comparison? 
-    # For now, just re-run comparison on two existing folders
+    # Reuse a persisted comparison of the two folders, computing it only once
     try:
         baseline_path = os.path.join('snapshots', baseline)
         current_path = os.path.join('snapshots', current)
-        diff_report = compare_snapshots(baseline_path, current_path)
-        return render_template('report.html', title='Comparison Report', report=diff_report)
+        report_id = report_store.report_id_for(baseline_path, current_path)
+        if not report_store.report_exists(report_id):
+            report_store.save_report(compare_snapshots(baseline_path, current_path))
+        if request.args.get('format') == 'json':
+            return redirect(url_for('main.api_report_summary', report_id=report_id))
+        return redirect(url_for('main.report_summary', report_id=report_id))
     except Exception as e:
         flash(f'Error generating report: {str(e)}')
         return redirect(url_for('main.dashboard'))
 
+def _json_response(data):
+    return current_app.response_class(serializer.dumps(data), mimetype='application/json')
+
+def _pagination_args():
+    page = request.args.get('page', 1, type=int)
+    per_page = min(request.args.get('per_page', 50, type=int), 500)
+    return page, max(1, per_page)
+
+@main_bp.route('/reports/<report_id>')
+@login_required
+def report_summary(report_id):
+    if not report_store.report_exists(report_id):
+        abort(404)
+    page, per_page = _pagination_args()
+    summary = report_store.load_summary(report_id)
+    devices = report_store.list_devices(report_id, page, per_page)
+    return render_template('report.html', title='Validation Report', summaries=[summary], devices=devices)
+
+@main_bp.route('/reports/<report_id>/devices/<device>')
+@login_required
+def report_device(report_id, device):
+    if not report_store.report_exists(report_id):
+        abort(404)
+    try:
+        detail = report_store.load_device(report_id, device)
+    except FileNotFoundError:
+        abort(404)
+    summary = report_store.load_summary(report_id)
+    return render_template('report_device.html', title=f'{device} - Validation Report', summary=summary, changes=detail)
+
+@main_bp.route('/api/reports/<report_id>')
+@login_required
+def api_report_summary(report_id):
+    if not report_store.report_exists(report_id):
+        abort(404)
+    return _json_response(report_store.load_summary(report_id))
+
+@main_bp.route('/api/reports/<report_id>/devices')
+@login_required
+def api_report_devices(report_id):
+    if not report_store.report_exists(report_id):
+        abort(404)
+    page, per_page = _pagination_args()
+    return _json_response(report_store.list_devices(report_id, page, per_page))
+
+@main_bp.route('/api/reports/<report_id>/devices/<device>')
+@login_required
+def api_report_device(report_id, device):
+    if not report_store.report_exists(report_id):
+        abort(404)
+    try:
+        return _json_response(report_store.load_device(report_id, device))
+    except FileNotFoundError:
+        abort(404)
+
 @main_bp.route('/help')
 def help_page():
     return render_template('help.html', title='Help')
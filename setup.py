@@ -10,12 +10,16 @@ setup(
         'unicon',
         'click',
         'pandas',
+        'numpy',
         'openpyxl',
         'PyYAML',
         'deepdiff',
         'jinja2',
         'tabulate',
     ],
+    extras_require={
+        'fast': ['orjson'],
+    },
     entry_points={
         'console_scripts': [
             'netsnap=netsnap.cli:cli',